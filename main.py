@@ -1,7 +1,9 @@
 # main.py
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 import urllib3
+from urllib3.util.retry import Retry
 import os
 from datetime import datetime
 
@@ -13,10 +15,45 @@ REDMINE_URL = "https://gesproy.pagina.cu"
 PROJECT_IDENTIFIER = "ps211lh010_001"
 WIKI_PAGE_TITLE = "Referencias_academicas"
 REDMINE_API_KEY = os.environ['REDMINE_API_KEY']  # Desde GitHub Secrets
+# Solo para peticiones a Redmine: la sesión compartida también habla con OpenAlex
+REDMINE_HEADERS = {
+    "Content-Type": "application/json",
+    "X-Redmine-API-Key": REDMINE_API_KEY
+}
+
+# === SESIÓN HTTP COMPARTIDA (keep-alive y pool de conexiones) ===
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "sia-os/1.0"})
+# Reintentos con espera exponencial ante límites de tasa (429) y errores 5xx
+_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "PUT"],
+    respect_retry_after_header=True,
+    raise_on_status=False  # Tras agotar reintentos, se devuelve la última respuesta
+)
+_adapter = HTTPAdapter(max_retries=_retry, pool_connections=4, pool_maxsize=8)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
 
 # === BÚSQUEDA CIENTÍFICA ===
 QUERY = "digital transformation environmental information system open data sustainability public sector"
 
+# === PLANTILLA MARKDOWN POR ARTÍCULO ===
+PAPER_TEMPLATE = """
+### {i}. {title}
+
+- **Autores:** {authors}
+- **Año:** {year} | **Revista:** {journal}
+- **Citas:** {citations}
+- **Resumen:** {abstract}
+- [🔗 Ver artículo]({url})
+
+---
+
+"""
+
 # ================================
 #       FUNCIONES
 # ================================
@@ -34,20 +71,18 @@ def buscar_openalex(query, limit=6):
     }
     try:
         print("🔍 Buscando en OpenAlex...")
-        response = requests.get(url, params=params, timeout=30)
+        response = SESSION.get(url, params=params, timeout=30)
         if response.status_code == 200:
-            data = response.json()
-            results = []
-            for item in data.get("results", []):
-                results.append({
-                    "title": item.get("title", "Sin título"),
-                    "authors": [author["author"]["display_name"] for author in item.get("authorships", [])[:4]],
-                    "year": item.get("publication_year"),
-                    "journal": item.get("primary_location", {}).get("source", {}).get("display_name", "Sin revista"),
-                    "citations": item.get("cited_by_count", 0),
-                    "abstract": item.get("abstract", "No disponible"),
-                    "url": item.get("primary_location", {}).get("landing_page_url") or item.get("doi", "#")
-                })
+            data = orjson.loads(response.content)
+            results = [{
+                "title": item.get("title", "Sin título"),
+                "authors": [author["author"]["display_name"] for author in item.get("authorships", [])],
+                "year": item.get("publication_year"),
+                "journal": item.get("primary_location", {}).get("source", {}).get("display_name", "Sin revista"),
+                "citations": item.get("cited_by_count", 0),
+                "abstract": item.get("abstract", "No disponible"),
+                "url": item.get("primary_location", {}).get("landing_page_url") or item.get("doi", "#")
+            } for item in data.get("results", [])]
             print(f"✅ {len(results)} artículos encontrados en OpenAlex.")
             return results
         else:
@@ -57,12 +92,11 @@ def buscar_openalex(query, limit=6):
         print(f"❌ Error conexión OpenAlex: {str(e)}")
         return []
 
-def formatear_papers_markdown(papers):
+def formatear_papers_markdown(papers, hoy):
     """
     Formatea los resultados en Markdown.
     """
-    hoy = datetime.now().strftime("%d/%m/%Y %H:%M")
-    md = f"""# Referencias Académicas - Transformación Digital del SIA
+    parts = [f"""# Referencias Académicas - Transformación Digital del SIA
 
 > Actualizado el {hoy} (automático)
 
@@ -70,57 +104,46 @@ Artículos científicos relevantes para el Sistema de Información Ambiental de
 
 ---
 
-"""
+"""]
     if not papers:
-        md += "❌ No se encontraron artículos científicos recientes.\n"
-        return md
+        parts.append("❌ No se encontraron artículos científicos recientes.\n")
+        return "".join(parts)
 
     for i, paper in enumerate(papers, 1):
-        title = paper.get("title", "Sin título")
-        url = paper.get("url", "#")
-        year = paper.get("year", "N/A")
-        citations = paper.get("citations", "N/A")
-        journal = paper.get("journal", "Sin revista")
-        abstract = (paper.get("abstract") or "No disponible")[:350] + "..."
-
-        authors = ", ".join(paper.get("authors", ["Anónimo"]))
-        if len(paper.get("authors", [])) > 4:
-            authors += " et al."
-
-        md += f"""
-### {i}. {title}
-
-- **Autores:** {authors}
-- **Año:** {year} | **Revista:** {journal}
-- **Citas:** {citations}
-- **Resumen:** {abstract}
-- [🔗 Ver artículo]({url})
-
----
-
-"""
-    return md
-
-def actualizar_wiki_redmine(contenido):
+        authors_list = paper.get("authors") or ["Anónimo"]
+        authors = ", ".join(authors_list[:4]) + (" et al." if len(authors_list) > 4 else "")
+        abstract = paper.get("abstract") or "No disponible"
+        if len(abstract) > 350:
+            abstract = abstract[:350] + "..."
+
+        parts.append(PAPER_TEMPLATE.format(
+            i=i,
+            title=paper.get("title", "Sin título"),
+            authors=authors,
+            year=paper.get("year", "N/A"),
+            journal=paper.get("journal", "Sin revista"),
+            citations=paper.get("citations", "N/A"),
+            abstract=abstract,
+            url=paper.get("url", "#")
+        ))
+    return "".join(parts)
+
+def actualizar_wiki_redmine(contenido, hoy):
     """
     Actualiza la página del wiki en Redmine.
     """
     url = f"{REDMINE_URL}/projects/{PROJECT_IDENTIFIER}/wiki/{WIKI_PAGE_TITLE}.json"
-    headers = {
-        "Content-Type": "application/json",
-        "X-Redmine-API-Key": REDMINE_API_KEY
-    }
     data = {
         "wiki_page": {
             "text": contenido.strip(),
-            "comments": f"Actualización automática - {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+            "comments": f"Actualización automática - {hoy}"
         }
     }
     try:
-        response = requests.put(
+        response = SESSION.put(
             url,
-            data=json.dumps(data),
-            headers=headers,
+            data=orjson.dumps(data),
+            headers=REDMINE_HEADERS,
             timeout=30,
             verify=False  # Necesario por certificado autofirmado
         )
@@ -143,9 +166,10 @@ def main():
         print("❌ No se encontraron artículos en OpenAlex.")
         return
 
-    contenido = formatear_papers_markdown(resultados)
+    hoy = datetime.now().strftime("%d/%m/%Y %H:%M")
+    contenido = formatear_papers_markdown(resultados, hoy)
     print("📝 Enviando a Redmine...")
-    if actualizar_wiki_redmine(contenido):
+    if actualizar_wiki_redmine(contenido, hoy):
         print("🎉 ¡Éxito! Tu wiki está actualizado.")
     else:
         print("⚠️ Falló la actualización en Redmine.")